@@ -6,68 +6,223 @@ Ollama Chat Application - A Tkinter-based chat interface for Ollama
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
 import threading
+import collections
 import json
+import pickle
+import queue
 import re
 import os
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional
 from ollama_client import OllamaClient
 from tools import ToolRegistry, format_crypto_display
 
+# orjson is optional; it is much faster for reading and writing large chat histories
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    orjson = None
+    _loads = json.loads
+
+
+# Markdown code fence delimiting code blocks in assistant replies
+CODE_FENCE = "```"
+
+
+def _dumps_line(obj) -> bytes:
+    """Encode one object as a single compact NDJSON line"""
+    if orjson is not None:
+        return orjson.dumps(obj) + b'\n'
+    return (json.dumps(obj, separators=(',', ':')) + '\n').encode('utf-8')
+
 
 class ChatHistory:
-    """Manages chat history persistence"""
+    """Manages chat history persistence
+
+    Chats are stored as NDJSON: a header line with the model, timestamp and
+    message count, followed by one message per line. Older files holding a
+    single JSON document are still read.
+
+    Messages that drop out of a live session's context window are appended
+    to a per-session spill file and folded back in whenever the chat is saved.
+    """
 
     def __init__(self, history_dir: str = None):
         if history_dir is None:
             history_dir = os.path.join(os.path.expanduser("~"), ".ollama_chat", "history")
         self.history_dir = history_dir
         os.makedirs(self.history_dir, exist_ok=True)
+        self._save_lock = threading.Lock()
+
+        # filename -> ((mtime_ns, size), metadata) so list_chats only parses changed files
+        self._index_path = os.path.join(self.history_dir, '.index.pickle')
+        self._index = self._load_index()
 
-    def save_chat(self, messages: List[Dict], model: str) -> str:
-        """Save chat to history"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    def _load_index(self) -> Dict:
+        """Load the cached chat metadata index, or start empty if missing/corrupt"""
+        try:
+            with open(self._index_path, 'rb') as f:
+                index = pickle.load(f)
+            if isinstance(index, dict):
+                return index
+        except Exception:
+            pass
+        return {}
+
+    def _save_index(self):
+        """Persist the chat metadata index"""
+        tmp_path = self._index_path + '.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(self._index, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._index_path)
+        except Exception as e:
+            print(f"Error saving chat index: {e}")
+
+    @staticmethod
+    def new_timestamp() -> str:
+        """Timestamp identifying a chat session"""
+        return datetime.now().strftime("%Y%m%d_%H%M%S")
+
+    def _spill_path(self, timestamp: str) -> str:
+        """Path of the spill file for a chat session"""
+        return os.path.join(self.history_dir, 'spill', f"{timestamp}.jsonl")
+
+    def spill_messages(self, timestamp: str, messages: List[Dict]):
+        """Append messages dropped from a session's live context to its spill file"""
+        path = self._spill_path(timestamp)
+        with self._save_lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'ab') as f:
+                f.write(b''.join(_dumps_line(msg) for msg in messages))
+
+    def clear_spill(self, timestamp: str):
+        """Remove a session's spill file"""
+        with self._save_lock:
+            try:
+                os.remove(self._spill_path(timestamp))
+            except FileNotFoundError:
+                pass
+
+    def _read_spill(self, timestamp: str, count: int) -> bytes:
+        """Read the first count spilled message lines of a session"""
+        if count <= 0:
+            return b''
+        with open(self._spill_path(timestamp), 'rb') as f:
+            data = f.read()
+        end = -1
+        for _ in range(count):
+            end = data.index(b'\n', end + 1)
+        return data[:end + 1]
+
+    def save_chat(self, messages: List[Dict], model: str, timestamp: str = None,
+                  spilled: int = 0) -> str:
+        """Save chat to history, overwriting the file for the same session timestamp
+
+        spilled is the number of earlier messages of the session that were
+        moved to its spill file; they are written ahead of messages.
+        """
+        if timestamp is None:
+            timestamp = self.new_timestamp()
         filename = f"chat_{model.replace(':', '_')}_{timestamp}.json"
         filepath = os.path.join(self.history_dir, filename)
 
-        data = {
+        header = {
             "model": model,
             "timestamp": timestamp,
-            "messages": messages
+            "message_count": spilled + len(messages)
         }
-
-        with open(filepath, 'w') as f:
-            json.dump(data, f, indent=2)
+        body = b''.join(_dumps_line(msg) for msg in messages)
+
+        # Write to a temp file and swap it in so readers never see a partial file
+        tmp_path = filepath + '.tmp'
+        with self._save_lock:
+            spilled_lines = self._read_spill(timestamp, spilled)
+            with open(tmp_path, 'wb') as f:
+                f.write(_dumps_line(header))
+                f.write(spilled_lines)
+                f.write(body)
+            os.replace(tmp_path, filepath)
 
         return filepath
 
     def list_chats(self) -> List[Dict]:
         """List all saved chats"""
         chats = []
-        if not os.path.exists(self.history_dir):
+        try:
+            # DirEntry carries the path and cached file type, saving a syscall per file
+            with os.scandir(self.history_dir) as it:
+                entries = sorted((e for e in it if e.name.endswith('.json') and e.is_file()),
+                                 key=lambda e: e.name, reverse=True)
+        except FileNotFoundError:
             return chats
 
-        for filename in sorted(os.listdir(self.history_dir), reverse=True):
-            if filename.endswith('.json'):
-                filepath = os.path.join(self.history_dir, filename)
-                try:
-                    with open(filepath, 'r') as f:
-                        data = json.load(f)
-                        chats.append({
-                            'filename': filename,
-                            'filepath': filepath,
-                            'model': data.get('model', 'unknown'),
-                            'timestamp': data.get('timestamp', ''),
-                            'message_count': len(data.get('messages', []))
-                        })
-                except Exception as e:
-                    print(f"Error loading {filename}: {e}")
+        index = {}
+        changed = False
+        for entry in entries:
+            filename = entry.name
+            filepath = entry.path
+            try:
+                st = entry.stat()
+                key = (st.st_mtime_ns, st.st_size)
+                cached = self._index.get(filename)
+                if cached is not None and cached[0] == key:
+                    meta = cached[1]
+                else:
+                    with open(filepath, 'rb') as f:
+                        header = self._read_header(f)
+                        if header is None:
+                            f.seek(0)
+                            data = json.load(f)
+                            header = {
+                                'model': data.get('model'),
+                                'timestamp': data.get('timestamp'),
+                                'message_count': len(data.get('messages', []))
+                            }
+                    meta = {
+                        'model': header.get('model') or 'unknown',
+                        'timestamp': header.get('timestamp') or '',
+                        'message_count': header.get('message_count', 0)
+                    }
+                    changed = True
+                index[filename] = (key, meta)
+                chats.append({'filename': filename, 'filepath': filepath, **meta})
+            except Exception as e:
+                print(f"Error loading {filename}: {e}")
+
+        # Drop entries for deleted files as well as recording re-parsed ones
+        if changed or index.keys() != self._index.keys():
+            self._index = index
+            self._save_index()
+
         return chats
 
+    @staticmethod
+    def _read_header(f) -> Optional[Dict]:
+        """Read the header line of a chat file, or None if it uses the old format"""
+        try:
+            header = _loads(f.readline())
+        except ValueError:
+            return None
+        if isinstance(header, dict) and 'message_count' in header and 'messages' not in header:
+            return header
+        return None
+
     def load_chat(self, filepath: str) -> Dict:
         """Load a chat from history"""
-        with open(filepath, 'r') as f:
-            return json.load(f)
+        with open(filepath, 'rb') as f:
+            header = self._read_header(f)
+            if header is None:
+                f.seek(0)
+                return json.load(f)
+
+            messages = [_loads(line) for line in f if line.strip()]
+        return {
+            "model": header.get("model"),
+            "timestamp": header.get("timestamp"),
+            "messages": messages
+        }
 
 
 class OllamaChatApp:
@@ -81,12 +236,38 @@ class OllamaChatApp:
         self.tool_registry = ToolRegistry()
         self.chat_history = ChatHistory()
         self.messages = []
+        self.chat_timestamp = ChatHistory.new_timestamp()
         self.current_model = None
+
+        # Only the newest messages are sent to the model; older ones are spilled to disk
+        self.context_window = 40
+        self._spilled_count = 0
         self.is_streaming = False
+        # Most recent auto-save, waited on at close so the last turn is not lost
+        self._save_thread = None
+
+        # Streamed text waiting to be inserted into the chat display
+        self._pending = collections.deque()
+        self._drain_scheduled = False
+        self._in_code_fence = False
+        # Trailing backticks that may be the start of a fence split across drains
+        self._fence_tail = ""
+
+        # A single reusable daemon worker runs streaming jobs, so only one stream
+        # exists at a time and an unfinished stream never holds up interpreter exit
+        self._jobs = queue.Queue()
+        self._closing = threading.Event()
+        threading.Thread(target=self._run_jobs, name='ollama-worker', daemon=True).start()
+
+        # Oldest lines are pruned from the display (not from self.messages)
+        self.max_display_lines = 5000
 
         # Setup UI
         self.setup_ui()
 
+        # Release resources when the window is closed
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
         # Check Ollama connection
         self.check_ollama_connection()
 
@@ -155,8 +336,18 @@ class OllamaChatApp:
         self.send_button.pack(side=tk.RIGHT, padx=(5, 0))
 
     def check_ollama_connection(self):
-        """Check if Ollama server is available"""
-        if self.client.is_available():
+        """Check if Ollama server is available without blocking the UI"""
+        self.set_status("Connecting to Ollama...", "orange")
+        threading.Thread(target=self._bg_check_connection, daemon=True).start()
+
+    def _bg_check_connection(self):
+        """Worker: probe the Ollama server and report back on the Tk thread"""
+        ok = self.client.is_available()
+        self._post(self._apply_connection_result, ok)
+
+    def _apply_connection_result(self, ok: bool):
+        """Update the UI with the result of the connection check"""
+        if ok:
             self.set_status("Connected to Ollama", "green")
             self.refresh_models()
         else:
@@ -169,15 +360,22 @@ class OllamaChatApp:
             )
 
     def refresh_models(self):
-        """Refresh the list of available models"""
-        models = self.client.list_models()
-        if models:
-            model_names = [m['name'] for m in models]
+        """Refresh the list of available models without blocking the UI"""
+        self.set_status("Loading models...", "orange")
+        threading.Thread(target=self._bg_refresh_models, daemon=True).start()
+
+    def _bg_refresh_models(self):
+        """Worker: fetch the model list and report back on the Tk thread"""
+        names = [m['name'] for m in self.client.list_models()]
+        self._post(self._apply_models, names)
+
+    def _apply_models(self, model_names: List[str]):
+        """Update the model selector with the fetched model names"""
+        if model_names:
             self.model_combo['values'] = model_names
-            if model_names:
-                self.model_combo.current(0)
-                self.current_model = model_names[0]
-            self.set_status(f"Found {len(models)} model(s)", "green")
+            self.model_combo.current(0)
+            self.current_model = model_names[0]
+            self.set_status(f"Found {len(model_names)} model(s)", "green")
         else:
             self.set_status("No models found", "orange")
             messagebox.showinfo(
@@ -225,14 +423,65 @@ class OllamaChatApp:
 
         # Add to messages list
         self.messages.append({"role": "user", "content": message})
+        self._trim_context()
 
-        # Start streaming response in a separate thread
+        # Stream the response on the worker thread
         self.is_streaming = True
         self.send_button.config(state=tk.DISABLED)
         self.set_status("Thinking...", "orange")
 
-        thread = threading.Thread(target=self.stream_response, daemon=True)
-        thread.start()
+        self._jobs.put(self.stream_response)
+
+    def _run_jobs(self):
+        """Worker: run queued streaming jobs one at a time until the app closes"""
+        while True:
+            job = self._jobs.get()
+            if self._closing.is_set():
+                return
+            try:
+                job()
+            except Exception as e:
+                print(f"Error in background job: {e}")
+
+    def _post(self, func, *args):
+        """Run func on the Tk thread; dropped once the window is closing"""
+        if self._closing.is_set():
+            return
+        try:
+            self.root.after(0, func, *args)
+        except (RuntimeError, tk.TclError):
+            # The root was destroyed between the check and the call
+            pass
+
+    def _trim_context(self):
+        """Spill the oldest non-system messages beyond the context window to disk"""
+        overflow = len(self.messages) - self.context_window
+        if overflow <= 0:
+            return
+
+        # Tool results must not be separated from the assistant tool call they
+        # answer, so keep spilling while the window would start with one
+        kept = []
+        spilled = []
+        started = False
+        for msg in self.messages:
+            role = msg.get('role')
+            if not started and role != 'system' and (overflow > 0 or role == 'tool'):
+                spilled.append(msg)
+                overflow -= 1
+            else:
+                kept.append(msg)
+                started = started or role != 'system'
+
+        try:
+            self.chat_history.spill_messages(self.chat_timestamp, spilled)
+        except Exception as e:
+            # Keep the messages in memory rather than lose them
+            print(f"Error spilling chat history: {e}")
+            return
+
+        self.messages = kept
+        self._spilled_count += len(spilled)
 
     def stream_response(self):
         """Stream the AI response"""
@@ -241,9 +490,9 @@ class OllamaChatApp:
             tools = self.tool_registry.get_tool_definitions()
 
             # Start assistant message
-            self.root.after(0, self.start_assistant_message)
+            self.start_assistant_message()
 
-            response_text = ""
+            response_parts = []
             tool_calls = []
 
             # Stream the response
@@ -252,9 +501,11 @@ class OllamaChatApp:
                 messages=self.messages,
                 tools=tools
             ):
+                if self._closing.is_set():
+                    return
+
                 if chunk.get("error"):
-                    self.root.after(0, self.add_to_current_message,
-                                  f"\n[Error: {chunk.get('message')}]", "error")
+                    self._enqueue_text(f"\n[Error: {chunk.get('message')}]", "error")
                     break
 
                 # Handle message content
@@ -264,8 +515,8 @@ class OllamaChatApp:
                     # Handle text content
                     if "content" in msg and msg["content"]:
                         content = msg["content"]
-                        response_text += content
-                        self.root.after(0, self.add_to_current_message, content, "assistant")
+                        response_parts.append(content)
+                        self._enqueue_text(content, "assistant")
 
                     # Handle tool calls
                     if "tool_calls" in msg and msg["tool_calls"]:
@@ -275,19 +526,21 @@ class OllamaChatApp:
                 if chunk.get("done", False):
                     break
 
+            response_text = "".join(response_parts)
+
             # Handle tool calls if any
             if tool_calls:
-                self.root.after(0, self.handle_tool_calls, tool_calls, response_text)
+                self._post(self.handle_tool_calls, tool_calls, response_text)
             else:
                 # Save assistant message
                 if response_text:
                     self.messages.append({"role": "assistant", "content": response_text})
-                self.root.after(0, self.finish_streaming)
+                self._post(self.finish_streaming)
 
         except Exception as e:
             error_msg = f"\n[Error: {str(e)}]"
-            self.root.after(0, self.add_to_current_message, error_msg, "error")
-            self.root.after(0, self.finish_streaming)
+            self._enqueue_text(error_msg, "error")
+            self._post(self.finish_streaming)
 
     def handle_tool_calls(self, tool_calls: List[Dict], assistant_message: str):
         """Handle tool calls from the AI"""
@@ -304,13 +557,13 @@ class OllamaChatApp:
             tool_name = function_info.get("name", "unknown")
             arguments = function_info.get("arguments", {})
 
-            self.add_to_current_message(f"\n\n[Calling tool: {tool_name}]", "tool")
+            self._enqueue_text(f"\n\n[Calling tool: {tool_name}]", "tool")
 
             # Execute the tool
             result = self.tool_registry.execute_tool(tool_name, arguments)
 
             # Display result
-            self.add_to_current_message(f"\n{result}\n", "code")
+            self._enqueue_text(f"\n{result}\n", "code")
 
             # Add tool result to messages
             self.messages.append({
@@ -319,67 +572,137 @@ class OllamaChatApp:
             })
 
         # Get final response with tool results
-        threading.Thread(target=self.stream_final_response, daemon=True).start()
+        self._trim_context()
+        self._jobs.put(self.stream_final_response)
 
     def stream_final_response(self):
         """Stream final response after tool calls"""
         try:
-            response_text = ""
+            response_parts = []
 
-            self.root.after(0, self.add_to_current_message, "\n", "assistant")
+            self._enqueue_text("\n", "assistant")
 
             for chunk in self.client.chat_stream(
                 model=self.current_model,
                 messages=self.messages,
                 tools=self.tool_registry.get_tool_definitions()
             ):
+                if self._closing.is_set():
+                    return
+
                 if chunk.get("error"):
-                    self.root.after(0, self.add_to_current_message,
-                                  f"\n[Error: {chunk.get('message')}]", "error")
+                    self._enqueue_text(f"\n[Error: {chunk.get('message')}]", "error")
                     break
 
                 if "message" in chunk and "content" in chunk["message"]:
                     content = chunk["message"]["content"]
                     if content:
-                        response_text += content
-                        self.root.after(0, self.add_to_current_message, content, "assistant")
+                        response_parts.append(content)
+                        self._enqueue_text(content, "assistant")
 
                 if chunk.get("done", False):
                     break
 
+            response_text = "".join(response_parts)
+
             # Save final assistant message
             if response_text:
                 self.messages.append({"role": "assistant", "content": response_text})
 
-            self.root.after(0, self.finish_streaming)
+            self._post(self.finish_streaming)
 
         except Exception as e:
             error_msg = f"\n[Error: {str(e)}]"
-            self.root.after(0, self.add_to_current_message, error_msg, "error")
-            self.root.after(0, self.finish_streaming)
+            self._enqueue_text(error_msg, "error")
+            self._post(self.finish_streaming)
 
     def start_assistant_message(self):
         """Start a new assistant message in the display"""
-        self.chat_display.config(state=tk.NORMAL)
-        self.chat_display.insert(tk.END, "\nAssistant: ", "assistant")
-        self.chat_display.see(tk.END)
-        self.chat_display.config(state=tk.DISABLED)
+        self._enqueue_text("\nAssistant: ", "assistant")
+
+    def _enqueue_text(self, text: str, tag: str = "assistant"):
+        """Queue text for the current message (safe to call from worker threads)"""
+        if self._closing.is_set():
+            return
+        self._pending.append((text, tag))
+        if not self._drain_scheduled:
+            self._drain_scheduled = True
+            try:
+                self.root.after_idle(self._drain_text_queue)
+            except (RuntimeError, tk.TclError):
+                pass
+
+    def _drain_text_queue(self):
+        """Insert all queued text, one insert per run of identically tagged text"""
+        # Reset before draining so text queued meanwhile schedules a new drain
+        self._drain_scheduled = False
+
+        runs = []
+        while self._pending:
+            text, tag = self._pending.popleft()
+            if runs and runs[-1][1] == tag:
+                runs[-1][0].append(text)
+            else:
+                runs.append(([text], tag))
+
+        if not runs:
+            return
 
-    def add_to_current_message(self, text: str, tag: str = "assistant"):
-        """Add text to the current message"""
         self.chat_display.config(state=tk.NORMAL)
+        for parts, tag in runs:
+            if tag == "assistant":
+                self._insert_with_code_fences("".join(parts))
+            else:
+                self._flush_fence_tail()
+                self.chat_display.insert(tk.END, "".join(parts), tag)
 
-        # Simple code block detection
-        if "```" in text or tag == "code":
-            self.chat_display.insert(tk.END, text, "code")
-        else:
-            self.chat_display.insert(tk.END, text, tag)
+        # Keep insertion cost bounded on long sessions
+        line_count = int(self.chat_display.index('end-1c').split('.')[0])
+        if line_count > self.max_display_lines:
+            overflow = line_count - self.max_display_lines
+            self.chat_display.delete('1.0', f'{overflow + 1}.0')
 
         self.chat_display.see(tk.END)
         self.chat_display.config(state=tk.DISABLED)
 
+    def _insert_with_code_fences(self, text: str):
+        """Insert assistant text, tagging fenced code blocks as "code"
+
+        Fence state is kept in self._in_code_fence so blocks that span
+        several streamed chunks are still highlighted. One or two trailing
+        backticks are held back in self._fence_tail, since the next chunk
+        may complete them into a fence.
+        """
+        text = self._fence_tail + text
+        stripped = text.rstrip("`")
+        if len(text) - len(stripped) < len(CODE_FENCE):
+            self._fence_tail = text[len(stripped):]
+            text = stripped
+        else:
+            self._fence_tail = ""
+
+        pieces = text.split(CODE_FENCE)
+        for i, piece in enumerate(pieces):
+            if i:
+                # The fence marker is drawn as part of the code block
+                self.chat_display.insert(tk.END, CODE_FENCE, "code")
+                self._in_code_fence = not self._in_code_fence
+            if piece:
+                self.chat_display.insert(tk.END, piece,
+                                         "code" if self._in_code_fence else "assistant")
+
+    def _flush_fence_tail(self):
+        """Insert held-back backticks once they can no longer start a fence"""
+        if self._fence_tail:
+            self.chat_display.insert(tk.END, self._fence_tail,
+                                     "code" if self._in_code_fence else "assistant")
+            self._fence_tail = ""
+
     def add_message_to_display(self, role: str, content: str, tag: str):
         """Add a complete message to the display"""
+        # Keep ordering with any streamed text that has not been drawn yet
+        self._drain_text_queue()
+
         self.chat_display.config(state=tk.NORMAL)
         self.chat_display.insert(tk.END, f"\n{role}: ", tag)
         self.chat_display.insert(tk.END, f"{content}\n", tag)
@@ -388,17 +711,48 @@ class OllamaChatApp:
 
     def finish_streaming(self):
         """Finish streaming and re-enable controls"""
+        # Draw the rest of the response, then close any unterminated code block
+        self._drain_text_queue()
+        if self._fence_tail:
+            self.chat_display.config(state=tk.NORMAL)
+            self._flush_fence_tail()
+            self.chat_display.see(tk.END)
+            self.chat_display.config(state=tk.DISABLED)
+        self._in_code_fence = False
+
         self.is_streaming = False
         self.send_button.config(state=tk.NORMAL)
         self.set_status("Ready", "green")
         self.input_text.focus()
 
-        # Auto-save chat history
+        # Auto-save chat history in the background
         if len(self.messages) > 0:
-            try:
-                self.chat_history.save_chat(self.messages, self.current_model)
-            except Exception as e:
-                print(f"Error saving chat history: {e}")
+            self._save_thread = threading.Thread(
+                target=self._save_chat_background,
+                args=(list(self.messages), self.current_model,
+                      self.chat_timestamp, self._spilled_count),
+                daemon=True)
+            self._save_thread.start()
+
+    def _save_chat_background(self, messages: List[Dict], model: str, timestamp: str,
+                              spilled: int):
+        """Save chat history from a worker thread"""
+        try:
+            self.chat_history.save_chat(messages, model, timestamp, spilled)
+        except Exception as e:
+            print(f"Error saving chat history: {e}")
+
+    def _retire_spill(self):
+        """Save the current session with its spilled messages, then delete its spill file"""
+        if not self._spilled_count:
+            return
+        try:
+            # Snapshot the list; a stream may still be appending to it
+            self.chat_history.save_chat(list(self.messages), self.current_model,
+                                        self.chat_timestamp, self._spilled_count)
+            self.chat_history.clear_spill(self.chat_timestamp)
+        except Exception as e:
+            print(f"Error saving chat history: {e}")
 
     def new_chat(self):
         """Start a new chat"""
@@ -406,13 +760,19 @@ class OllamaChatApp:
             # Save current chat
             if len(self.messages) > 0:
                 try:
-                    filepath = self.chat_history.save_chat(self.messages, self.current_model)
+                    filepath = self.chat_history.save_chat(self.messages, self.current_model,
+                                                           self.chat_timestamp,
+                                                           self._spilled_count)
+                    # The saved chat now holds the spilled messages too
+                    self.chat_history.clear_spill(self.chat_timestamp)
                     self.set_status(f"Chat saved", "green")
                 except Exception as e:
                     messagebox.showerror("Error", f"Failed to save chat: {e}")
 
             # Clear messages
             self.messages = []
+            self.chat_timestamp = ChatHistory.new_timestamp()
+            self._spilled_count = 0
 
             # Clear display
             self.chat_display.config(state=tk.NORMAL)
@@ -471,10 +831,12 @@ class OllamaChatApp:
                 if idx < len(chats):
                     chat = chats[idx]
                     try:
+                        self._retire_spill()
                         data = self.chat_history.load_chat(chat['filepath'])
 
                         # Load messages
                         self.messages = data.get('messages', [])
+                        self.chat_timestamp = data.get('timestamp') or ChatHistory.new_timestamp()
                         self.current_model = data.get('model', self.current_model)
 
                         # Update model selection
@@ -499,6 +861,12 @@ class OllamaChatApp:
                                 self.add_message_to_display("Tool", content, "tool")
 
                         self.chat_display.config(state=tk.DISABLED)
+
+                        # The saved file holds the whole chat, so start a fresh spill
+                        self.chat_history.clear_spill(self.chat_timestamp)
+                        self._spilled_count = 0
+                        self._trim_context()
+
                         self.set_status("Chat loaded", "green")
                         history_window.destroy()
 
@@ -508,6 +876,18 @@ class OllamaChatApp:
         ttk.Button(button_frame, text="Load Selected", command=load_selected).pack(side=tk.LEFT)
         ttk.Button(button_frame, text="Close", command=history_window.destroy).pack(side=tk.RIGHT)
 
+    def on_close(self):
+        """Clean up and close the application"""
+        # Stop the worker from touching the UI; an in-flight stream is left to the
+        # daemon thread rather than closing the session out from under it
+        self._closing.set()
+        if self._save_thread is not None:
+            self._save_thread.join(timeout=2)
+        self._retire_spill()
+        if not self.is_streaming:
+            self.client.close()
+        self.root.destroy()
+
     def run(self):
         """Start the application"""
         self.root.mainloop()
@@ -6,19 +6,64 @@ Handles communication with local Ollama server
 
 import json
 import requests
+from requests.adapters import HTTPAdapter
 from typing import Iterator, List, Dict, Optional, Callable
 
+# orjson is optional; it is much faster for the per-chunk decode when streaming
+try:
+    import orjson
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+    _JSONDecodeError = orjson.JSONDecodeError
+except ImportError:
+    _loads = json.loads
+    _JSONDecodeError = json.JSONDecodeError
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
 
 class OllamaClient:
+    _JSON_HEADERS = {'Content-Type': 'application/json'}
+
     def __init__(self, base_url: str = "http://localhost:11434"):
         self.base_url = base_url
 
+        # Reuse connections to the local server instead of reconnecting per call
+        self._session = requests.Session()
+        self._session.headers['Connection'] = 'keep-alive'
+        self._session.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=4))
+
+        # (tools list, encoded JSON) for the last tool definitions sent
+        self._tools_encoded = None
+
+    def close(self):
+        """Close pooled connections to the Ollama server"""
+        self._session.close()
+
+    def _encode_payload(self,
+                        model: str,
+                        messages: List[Dict[str, str]],
+                        stream: bool,
+                        tools: Optional[List[Dict]] = None) -> bytes:
+        """Encode a chat request body, reusing the encoded tools when unchanged"""
+        body = _dumps({"model": model, "messages": messages, "stream": stream})
+        if not tools:
+            return body
+
+        # ToolRegistry hands out the same cached list until a tool is registered
+        if self._tools_encoded is None or self._tools_encoded[0] is not tools:
+            self._tools_encoded = (tools, _dumps(tools))
+
+        # Splice the tools into the encoded object instead of re-encoding them
+        return body[:-1] + b',"tools":' + self._tools_encoded[1] + b'}'
+
     def list_models(self) -> List[Dict]:
         """Get list of available models from Ollama"""
         try:
-            response = requests.get(f"{self.base_url}/api/tags")
+            response = self._session.get(f"{self.base_url}/api/tags")
             response.raise_for_status()
-            data = response.json()
+            data = _loads(response.content)
             return data.get('models', [])
         except Exception as e:
             print(f"Error listing models: {e}")
@@ -40,34 +85,54 @@ class OllamaClient:
             Response chunks from the API
         """
         url = f"{self.base_url}/api/chat"
-
-        payload = {
-            "model": model,
-            "messages": messages,
-            "stream": True
-        }
-
-        if tools:
-            payload["tools"] = tools
+        body = self._encode_payload(model, messages, True, tools)
 
         try:
-            response = requests.post(url, json=payload, stream=True)
-            response.raise_for_status()
-
-            for line in response.iter_lines():
-                if line:
-                    try:
-                        chunk = json.loads(line)
-                        yield chunk
-                    except json.JSONDecodeError as e:
-                        print(f"Error decoding JSON: {e}")
-                        continue
+            # Closing a fully read response hands the connection back to the pool
+            with self._session.post(url, data=body, headers=self._JSON_HEADERS,
+                                    stream=True) as response:
+                response.raise_for_status()
+
+                # Split NDJSON lines from raw bytes ourselves; cheaper than iter_lines()
+                buf = bytearray()
+                for data in response.iter_content(chunk_size=8192):
+                    buf.extend(data)
+                    while True:
+                        idx = buf.find(b'\n')
+                        if idx < 0:
+                            break
+                        line = bytes(buf[:idx])
+                        del buf[:idx + 1]
+                        chunk = self._decode_line(line)
+                        if chunk is not None:
+                            if chunk.get("done"):
+                                # Callers stop at "done"; read to EOF first so the
+                                # socket is reusable instead of being dropped
+                                for _ in response.iter_content(chunk_size=8192):
+                                    pass
+                            yield chunk
+
+                # Trailing line without a newline
+                chunk = self._decode_line(bytes(buf))
+                if chunk is not None:
+                    yield chunk
         except requests.exceptions.RequestException as e:
             yield {
                 "error": True,
                 "message": f"Error communicating with Ollama: {str(e)}"
             }
 
+    @staticmethod
+    def _decode_line(line: bytes) -> Optional[Dict]:
+        """Decode one NDJSON line, returning None for blank or invalid lines"""
+        if not line.strip():
+            return None
+        try:
+            return _loads(line)
+        except _JSONDecodeError as e:
+            print(f"Error decoding JSON: {e}")
+            return None
+
     def chat(self,
             model: str,
             messages: List[Dict[str, str]],
@@ -84,21 +149,13 @@ class OllamaClient:
             Complete response dict
         """
         url = f"{self.base_url}/api/chat"
-
-        payload = {
-            "model": model,
-            "messages": messages,
-            "stream": False
-        }
-
-        if tools:
-            payload["tools"] = tools
+        body = self._encode_payload(model, messages, False, tools)
 
         try:
-            response = requests.post(url, json=payload)
+            response = self._session.post(url, data=body, headers=self._JSON_HEADERS)
             response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            return _loads(response.content)
+        except (requests.exceptions.RequestException, _JSONDecodeError) as e:
             return {
                 "error": True,
                 "message": f"Error communicating with Ollama: {str(e)}"
@@ -107,7 +164,7 @@ class OllamaClient:
     def is_available(self) -> bool:
         """Check if Ollama server is available"""
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=2)
+            response = self._session.get(f"{self.base_url}/api/tags", timeout=2)
             return response.status_code == 200
         except:
             return False
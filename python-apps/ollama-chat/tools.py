@@ -4,15 +4,28 @@ Tool definitions and implementations for Ollama Chat
 """
 
 import json
+import time
 import requests
 from typing import Dict, List, Any
 
+# Keep-alive connection to CoinGecko, shared by all tool calls
+_session = requests.Session()
+
+# Last successful CoinGecko result, reused for _CRYPTO_CACHE_TTL seconds
+_CRYPTO_CACHE_TTL = 30.0
+_cache = {'t': 0.0, 'v': None}
+
+# Field order of each row returned by get_top_cryptocurrencies
+CRYPTO_COLUMNS = ("name", "symbol", "price_usd", "market_cap_usd",
+                  "change_24h_pct", "volume_24h_usd")
+
 
 class ToolRegistry:
     """Registry for available tools"""
 
     def __init__(self):
         self.tools = {}
+        self._definitions_cache = None
         self._register_default_tools()
 
     def _register_default_tools(self):
@@ -35,22 +48,26 @@ class ToolRegistry:
             "name": name,
             "description": description,
             "function": function,
-            "parameters": parameters
-        }
-
-    def get_tool_definitions(self) -> List[Dict]:
-        """Get tool definitions for Ollama API"""
-        definitions = []
-        for tool_name, tool_info in self.tools.items():
-            definitions.append({
+            "parameters": parameters,
+            # Ollama API definition, built once here rather than per request
+            "definition": {
                 "type": "function",
                 "function": {
-                    "name": tool_info["name"],
-                    "description": tool_info["description"],
-                    "parameters": tool_info["parameters"]
+                    "name": name,
+                    "description": description,
+                    "parameters": parameters
                 }
-            })
-        return definitions
+            }
+        }
+        self._definitions_cache = None
+
+    def get_tool_definitions(self) -> List[Dict]:
+        """Get tool definitions for Ollama API (built once, until a tool is registered)"""
+        if self._definitions_cache is not None:
+            return self._definitions_cache
+
+        self._definitions_cache = [tool_info["definition"] for tool_info in self.tools.values()]
+        return self._definitions_cache
 
     def execute_tool(self, tool_name: str, arguments: Dict[str, Any]) -> str:
         """Execute a tool by name with given arguments"""
@@ -72,6 +89,10 @@ def get_top_cryptocurrencies() -> Dict:
     Returns:
         Dict containing cryptocurrency data or error message
     """
+    now = time.monotonic()
+    if _cache['v'] is not None and now - _cache['t'] < _CRYPTO_CACHE_TTL:
+        return _cache['v']
+
     try:
         url = "https://api.coingecko.com/api/v3/coins/markets"
         params = {
@@ -83,30 +104,33 @@ def get_top_cryptocurrencies() -> Dict:
             "price_change_percentage": "24h"
         }
 
-        response = requests.get(url, params=params, timeout=10)
+        response = _session.get(url, params=params, timeout=10)
         response.raise_for_status()
 
         data = response.json()
 
-        # Format the data nicely
-        cryptocurrencies = []
-        for i, coin in enumerate(data, 1):
-            crypto_info = {
-                "rank": i,
-                "name": coin.get("name", "N/A"),
-                "symbol": coin.get("symbol", "N/A").upper(),
-                "current_price": f"${coin.get('current_price', 0):,.2f}",
-                "market_cap": f"${coin.get('market_cap', 0):,.0f}",
-                "24h_change": f"{coin.get('price_change_percentage_24h', 0):.2f}%",
-                "24h_volume": f"${coin.get('total_volume', 0):,.0f}"
-            }
-            cryptocurrencies.append(crypto_info)
-
-        return {
+        # Raw values in rank order; formatting is left to format_crypto_display
+        rows = [
+            (
+                coin.get("name") or "N/A",
+                (coin.get("symbol") or "N/A").upper(),
+                coin.get("current_price") or 0,
+                coin.get("market_cap") or 0,
+                coin.get("price_change_percentage_24h") or 0,
+                coin.get("total_volume") or 0
+            )
+            for coin in data
+        ]
+
+        result = {
             "success": True,
-            "data": cryptocurrencies,
+            "columns": CRYPTO_COLUMNS,
+            "rows": rows,
             "timestamp": "now"
         }
+        _cache['v'] = result
+        _cache['t'] = now
+        return result
 
     except requests.exceptions.RequestException as e:
         return {
@@ -125,20 +149,12 @@ def format_crypto_display(crypto_data: Dict) -> str:
     if not crypto_data.get("success"):
         return f"Error: {crypto_data.get('error', 'Unknown error')}"
 
-    lines = ["Top 10 Cryptocurrencies by Market Cap:\n"]
-    lines.append("=" * 80)
-
-    for crypto in crypto_data.get("data", []):
-        line = (
-            f"{crypto['rank']:2d}. {crypto['name']:15s} ({crypto['symbol']:6s}) "
-            f"| Price: {crypto['current_price']:>12s} "
-            f"| 24h: {crypto['24h_change']:>8s} "
-            f"| MCap: {crypto['market_cap']}"
-        )
-        lines.append(line)
-
-    lines.append("=" * 80)
-    return "\n".join(lines)
+    separator = "=" * 80
+    table = "\n".join(
+        f"{i:2d}. {n:15s} ({s:6s}) | Price: ${p:>10,.2f} | 24h: {c:>7.2f}% | MCap: ${m:>14,.0f}"
+        for i, (n, s, p, m, c, v) in enumerate(crypto_data.get("rows", []), 1)
+    )
+    return f"Top 10 Cryptocurrencies by Market Cap:\n\n{separator}\n{table}\n{separator}"
 
 
 if __name__ == '__main__':
@@ -4,102 +4,263 @@ OS Detection and Package Manager Utility
 Detects Linux distribution and provides appropriate package manager commands
 """
 
+import functools
+import json
+import logging
 import platform
-import subprocess
+import re
+import shutil
 import os
+import types
+from enum import IntEnum
+
+_log = logging.getLogger(__name__)
+
+OS_RELEASE_PATH = '/etc/os-release'
+_OS_RELEASE_MAX_READ = 4096
+
+
+class PM(IntEnum):
+    """Supported package managers; values index the per-manager tables below"""
+    UNKNOWN = 0
+    APT = 1
+    DNF = 2
+    YUM = 3
+    PACMAN = 4
+    ZYPPER = 5
+
+
+# Lookup tables are read-only module constants, built once at import.
+
+# os-release ID / ID_LIKE value -> (distro family, package manager)
+_DISTRO_TABLE = types.MappingProxyType({
+    'ubuntu': ('debian', PM.APT),
+    'debian': ('debian', PM.APT),
+    'fedora': ('fedora', PM.DNF),
+    'centos': ('rhel', PM.YUM),
+    'rhel': ('rhel', PM.YUM),
+    'arch': ('arch', PM.PACMAN),
+    'opensuse': ('opensuse', PM.ZYPPER),
+    'opensuse-leap': ('opensuse', PM.ZYPPER),
+    'opensuse-tumbleweed': ('opensuse', PM.ZYPPER),
+})
+
+# Single-pass fallback scan of NAME/PRETTY_NAME for distros without a known ID.
+# Built from _DISTRO_TABLE (longest keys first) so new distros are one-line additions.
+_DISTRO_RE = re.compile(
+    r'\b(' + '|'.join(map(re.escape, sorted(_DISTRO_TABLE, key=len, reverse=True))) + r')\b',
+    re.I)
+
+# Cached results are only reused if written by the same detection logic. Bump
+# _CACHE_VERSION in any change to _DISTRO_TABLE or _detect_distro.
+_CACHE_VERSION = 2
+
+# Install command template, indexed by PM
+_INSTALL_TEMPLATES = (
+    None,
+    'sudo apt update && sudo apt install -y {pkgs}',
+    'sudo dnf install -y {pkgs}',
+    'sudo yum install -y {pkgs}',
+    'sudo pacman -S --noconfirm {pkgs}',
+    'sudo zypper install -y {pkgs}'
+)
+
+# Packages providing Tkinter for Python 3, indexed by PM
+_PYTHON_TK = (
+    ('python3-tk',),
+    ('python3-tk',),
+    ('python3-tkinter',),
+    ('python3-tkinter',),
+    ('tk',),
+    ('python3-tk',)
+)
+
+
+def _cache_path():
+    """Location of the cached detection result"""
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'linuxappsuite', 'osinfo.json')
+
+
+def _parse_os_release(path=OS_RELEASE_PATH):
+    """Minimal os-release parser for Pythons without platform.freedesktop_os_release"""
+    # The keys we need are near the top; don't slurp pathologically large files
+    with open(path, 'r') as f:
+        text = f.read(_OS_RELEASE_MAX_READ)
+    lines = text.splitlines()
+    if len(text) == _OS_RELEASE_MAX_READ and not text.endswith('\n'):
+        lines.pop()  # truncated last line
+
+    data = {}
+    for line in lines:
+        key, _, value = line.partition('=')
+        data[key] = value.strip().strip('"\'')
+    return data
+
+
+def _read_os_release():
+    """Read os-release fields, preferring the stdlib parser (Python 3.10+)"""
+    try:
+        return platform.freedesktop_os_release()
+    except (AttributeError, OSError):
+        return _parse_os_release()
+
+
+def _command_exists(command):
+    """PATH lookup without spawning `which`; uncached so newly installed commands show up"""
+    return shutil.which(command) is not None
 
 
 class OSDetector:
+    __slots__ = ('system', '_distro', '_package_manager', '_detected')
+
     def __init__(self):
         self.system = platform.system()
-        self.distro = None
-        self.package_manager = None
-        self._detect_distro()
 
-    def _detect_distro(self):
-        """Detect Linux distribution and package manager"""
+        # Distro detection is deferred until distro/package_manager are first used
+        self._distro = None
+        self._package_manager = None
+        self._detected = False
+
+    @property
+    def distro(self):
+        """Detected distribution family (None on non-Linux systems)"""
+        if not self._detected:
+            self._detect()
+        return self._distro
+
+    @property
+    def package_manager(self):
+        """Detected package manager as a PM (None on non-Linux systems)"""
+        if not self._detected:
+            self._detect()
+        return self._package_manager
+
+    @property
+    def package_manager_name(self):
+        """Package manager as its command name, e.g. 'apt' (None on non-Linux systems)"""
+        pm = self.package_manager
+        return pm.name.lower() if pm is not None else None
+
+    def _detect(self):
+        """Run detection, reusing the last result while /etc/os-release is unchanged"""
+        self._detected = True
         if self.system != "Linux":
             return
+        try:
+            mtime = os.stat(OS_RELEASE_PATH).st_mtime_ns
+        except OSError:
+            self._detect_distro()
+            return
+        if self._load_cached(mtime):
+            return
+        # Don't persist a failed detection; retry on the next run instead
+        if self._detect_distro():
+            self._save_cached(mtime)
+
+    def _load_cached(self, mtime):
+        """Load a cached detection result for this os-release mtime and detection logic"""
+        try:
+            with open(_cache_path(), 'r') as f:
+                cached = json.load(f)
+            if cached.get('version') != _CACHE_VERSION or cached.get('mtime') != mtime:
+                return False
+            self._distro = cached['distro']
+            self._package_manager = PM[cached['pm'].upper()]
+            return True
+        except (OSError, ValueError, KeyError, AttributeError):
+            return False
+
+    def _save_cached(self, mtime):
+        """Atomically write the detection result to the cache"""
+        path = _cache_path()
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, 'w') as f:
+                json.dump({
+                    'version': _CACHE_VERSION,
+                    'mtime': mtime,
+                    'distro': self._distro,
+                    'pm': self._package_manager.name.lower()
+                }, f)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+    def _detect_distro(self):
+        """Detect Linux distribution and package manager
+
+        Returns False if os-release could not be read or parsed.
+        """
+        if self.system != "Linux":
+            return False
 
         # Try to read /etc/os-release
         try:
-            with open('/etc/os-release', 'r') as f:
-                os_release = f.read()
-
-            if 'ubuntu' in os_release.lower() or 'debian' in os_release.lower():
-                self.distro = 'debian'
-                self.package_manager = 'apt'
-            elif 'fedora' in os_release.lower():
-                self.distro = 'fedora'
-                self.package_manager = 'dnf'
-            elif 'centos' in os_release.lower() or 'rhel' in os_release.lower():
-                self.distro = 'rhel'
-                self.package_manager = 'yum'
-            elif 'arch' in os_release.lower():
-                self.distro = 'arch'
-                self.package_manager = 'pacman'
-            elif 'opensuse' in os_release.lower():
-                self.distro = 'opensuse'
-                self.package_manager = 'zypper'
+            data = _read_os_release()
+
+            # Prefer the distro's own ID, then the distros it declares itself like.
+            # Only these two short fields are lowercased, once, not the whole file.
+            distro_ids = f"{data.get('ID', '')} {data.get('ID_LIKE', '')}".lower().split()
+            for distro_id in distro_ids:
+                if distro_id in _DISTRO_TABLE:
+                    self._distro, self._package_manager = _DISTRO_TABLE[distro_id]
+                    break
             else:
-                self.distro = 'unknown'
-                self.package_manager = 'unknown'
+                m = _DISTRO_RE.search(f"{data.get('NAME', '')} {data.get('PRETTY_NAME', '')}")
+                if m:
+                    self._distro, self._package_manager = _DISTRO_TABLE[m.group(1).lower()]
+                else:
+                    self._distro = 'unknown'
+                    self._package_manager = PM.UNKNOWN
         except Exception as e:
-            print(f"Error detecting distro: {e}")
-            self.distro = 'unknown'
-            self.package_manager = 'unknown'
+            _log.warning("Error detecting distro: %s", e)
+            self._distro = 'unknown'
+            self._package_manager = PM.UNKNOWN
+            return False
+        return True
 
     def get_install_command(self, packages):
         """Get package installation command for current distro"""
-        if isinstance(packages, str):
-            packages = [packages]
+        pkg_string = packages if isinstance(packages, str) else ' '.join(packages)
 
-        pkg_string = ' '.join(packages)
-
-        commands = {
-            'apt': f'sudo apt update && sudo apt install -y {pkg_string}',
-            'dnf': f'sudo dnf install -y {pkg_string}',
-            'yum': f'sudo yum install -y {pkg_string}',
-            'pacman': f'sudo pacman -S --noconfirm {pkg_string}',
-            'zypper': f'sudo zypper install -y {pkg_string}'
-        }
-
-        return commands.get(self.package_manager, f'# Unknown package manager, install: {pkg_string}')
+        pm = self.package_manager
+        template = _INSTALL_TEMPLATES[pm] if pm is not None else None
+        if template is None:
+            return f'# Unknown package manager, install: {pkg_string}'
+        return template.format(pkgs=pkg_string)
 
     def check_command_exists(self, command):
         """Check if a command exists on the system"""
-        try:
-            subprocess.run(['which', command],
-                         stdout=subprocess.PIPE,
-                         stderr=subprocess.PIPE,
-                         check=True)
-            return True
-        except subprocess.CalledProcessError:
-            return False
+        return _command_exists(command)
+
+    def check_commands_exist(self, commands):
+        """Check several commands at once, returning {command: exists}"""
+        return {command: _command_exists(command) for command in commands}
 
     def get_python_tk_package(self):
         """Get the appropriate python-tk package name for the distro"""
-        packages = {
-            'apt': ['python3-tk'],
-            'dnf': ['python3-tkinter'],
-            'yum': ['python3-tkinter'],
-            'pacman': ['tk'],
-            'zypper': ['python3-tk']
-        }
-        return packages.get(self.package_manager, ['python3-tk'])
+        return list(_PYTHON_TK[self.package_manager or PM.UNKNOWN])
 
     def get_info(self):
         """Get system information"""
         return {
             'system': self.system,
             'distro': self.distro,
-            'package_manager': self.package_manager,
+            'package_manager': self.package_manager_name,
             'python_version': platform.python_version()
         }
 
 
+@functools.lru_cache(maxsize=1)
+def get_detector():
+    """Shared OSDetector instance; detection runs once per process"""
+    return OSDetector()
+
+
 if __name__ == '__main__':
-    detector = OSDetector()
+    detector = get_detector()
     info = detector.get_info()
     print("System Information:")
     for key, value in info.items():